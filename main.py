@@ -9,17 +9,37 @@ Usage:
     python main.py apply --id <uuid> --submit    # Submit specific application
     python main.py test                          # Test with dummy data
     python main.py test --visible                # Test with visible browser
+    python main.py apply --all --refresh-auth    # Ignore the saved session and log in again
+    python main.py apply --all --workers 5       # Process up to 5 applicants at once
+    python main.py test --visible --full-assets  # Load every asset (debugging)
 """
 
+from __future__ import annotations
+
 import argparse
+import asyncio
+import contextvars
+import functools
+import hashlib
+import json
+import logging
 import os
-from datetime import datetime
-from typing import Optional, List, Dict
+import re
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from logging.handlers import MemoryHandler
+from urllib.parse import urlsplit
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional, List, Dict, Tuple
 
-from playwright.sync_api import sync_playwright, Page
-from supabase import create_client, Client
 from dotenv import load_dotenv
 
+# Playwright and supabase are imported where they are used, so --help and
+# argument errors don't pay for loading them
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, ElementHandle, Locator, Page, Playwright, Route
+    from supabase import Client
+
 load_dotenv()
 
 # =============================================================================
@@ -35,52 +55,165 @@ TIMEOUT_SHORT = 5000
 TIMEOUT_MEDIUM = 15000
 TIMEOUT_LONG = 45000
 
+# Supabase REST timeout (s)
+SUPABASE_TIMEOUT = 10
+MARK_BATCH_SIZE = 200  # Submission ids per bulk update
+PENDING_PAGE_SIZE = 50  # Pending applications fetched per request
+
+# Only the new_hire_submissions columns format_applicant_for_bot reads
+SUBMISSION_COLUMNS = (
+    "id,first_name,last_name,middle_name,date_of_birth,ssn_last_4,"
+    "applicant_email,applicant_phone"
+)
+
+# Browser
+VIEWPORT = {"width": 1024, "height": 600}  # Above Material's 960px breakpoint, so the desktop layout stays
+# Chromium features the bot never uses (GPU, extensions, background fetches, translate prompt)
+LAUNCH_ARGS = [
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-features=TranslateUI",
+]
+MAX_WORKERS = 3  # Concurrent browser contexts in --all mode
+
+# Requests the bot never needs - aborted before they hit the network
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+BLOCKED_URL_MARKERS = ("analytics", "googletagmanager", "doubleclick")
+
+# Saved portal session (cookies + dashboard URL), reused across runs
+AUTH_STATE_PATH = "pitid_state.json"
+
+# Selectors that worked last time, keyed by "<url path>|<field>", plus a hash of
+# each form's field labels so a portal redeploy invalidates them
+SELECTOR_CACHE_PATH = ".selector_cache.json"
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Credentials from the environment (or .env), read once at import."""
+    supabase_url: str
+    supabase_key: str
+    pitid_username: str
+    pitid_password: str
+    
+    def validate(self, supabase: bool = True):
+        """Raise ValueError naming every missing variable the command needs."""
+        required = {"PITID_USERNAME": self.pitid_username, "PITID_PASSWORD": self.pitid_password}
+        if supabase:
+            required.update({"SUPABASE_URL": self.supabase_url, "SUPABASE_KEY": self.supabase_key})
+        missing = [name for name, value in required.items() if not value]
+        if missing:
+            raise ValueError(f"Missing {', '.join(missing)}")
+
+
+def _load_settings() -> Settings:
+    """Read the bot's credentials from the environment."""
+    return Settings(
+        supabase_url=os.getenv("SUPABASE_URL", ""),
+        supabase_key=os.getenv("SUPABASE_KEY", ""),
+        pitid_username=os.getenv("PITID_USERNAME", ""),
+        pitid_password=os.getenv("PITID_PASSWORD", ""),
+    )
+
+
+SETTINGS = _load_settings()
+
+
+# =============================================================================
+# LOGGING
+# =============================================================================
+
+_CONSOLE = logging.StreamHandler(sys.stdout)
+_CONSOLE.setFormatter(logging.Formatter("%(asctime)s %(message)s", "%H:%M:%S"))
+
+# Per-applicant buffer for the current worker task (None = log straight to the console)
+_LOG_BUFFER: contextvars.ContextVar[Optional[MemoryHandler]] = contextvars.ContextVar("_LOG_BUFFER", default=None)
+
+
+class _ApplicantLogHandler(logging.Handler):
+    """Route records into the current applicant's buffer, or to the console if there is none."""
+    
+    def emit(self, record: logging.LogRecord):
+        (_LOG_BUFFER.get() or _CONSOLE).handle(record)
+
+
+logger = logging.getLogger("pit_bot")
+logger.setLevel(logging.INFO)
+logger.addHandler(_ApplicantLogHandler())
+logger.propagate = False
+
 
 # =============================================================================
 # SUPABASE FUNCTIONS
 # =============================================================================
 
+@functools.lru_cache(maxsize=None)
 def get_supabase_client() -> Client:
-    """Get Supabase client instance."""
-    url = os.getenv("SUPABASE_URL")
-    key = os.getenv("SUPABASE_KEY")
-    if not url or not key:
+    """Get the shared Supabase client instance (created once per run)."""
+    from supabase import create_client, ClientOptions
+    
+    if not SETTINGS.supabase_url or not SETTINGS.supabase_key:
         raise ValueError("Missing SUPABASE_URL or SUPABASE_KEY")
-    return create_client(url, key)
+    return create_client(
+        SETTINGS.supabase_url,
+        SETTINGS.supabase_key,
+        options=ClientOptions(postgrest_client_timeout=SUPABASE_TIMEOUT),
+    )
 
 
-def get_pending_airport_applications() -> List[Dict]:
-    """Fetch new hires at airport store that need badge applications."""
+def iter_pending_airport_applications(page_size: int = PENDING_PAGE_SIZE) -> Iterator[Dict]:
+    """Yield new hires at airport store that need badge applications, a page at a time.
+    
+    Filtering happens in Postgres (see supabase/migrations), so only pending
+    rows come back. Pages are keyed on id (each page starts after the last id
+    seen), so rows inserted mid-run can't shift a row back into a later page and
+    get it submitted twice. A row inserted behind the cursor is picked up next run.
+    """
     client = get_supabase_client()
     
-    response = client.table("new_hire_submissions").select(
-        "*, new_hire_setup_tasks!new_hire_setup_tasks_new_hire_id_fkey(*)"
-    ).eq("store_number", AIRPORT_STORE).not_.is_("ssn_last_4", "null").execute()
-    
-    pending = []
-    for record in response.data:
-        setup_tasks = record.get("new_hire_setup_tasks")
-        if not setup_tasks:
-            pending.append(record)
-        elif isinstance(setup_tasks, list):
-            if setup_tasks and not setup_tasks[0].get("airport_badge_request_sent"):
-                pending.append(record)
-        elif isinstance(setup_tasks, dict):
-            if not setup_tasks.get("airport_badge_request_sent"):
-                pending.append(record)
-    return pending
+    last_id = None
+    while True:
+        query = client.rpc(
+            "pending_airport_applications", {"p_store_number": AIRPORT_STORE}
+        ).select(SUBMISSION_COLUMNS)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        response = query.order("id").limit(page_size).execute()
+        yield from response.data
+        if len(response.data) < page_size:
+            return
+        last_id = response.data[-1]["id"]
 
 
 def get_application_by_id(submission_id: str) -> Optional[Dict]:
     """Fetch a single new hire submission by ID."""
     client = get_supabase_client()
     response = client.table("new_hire_submissions").select(
-        "*, new_hire_setup_tasks!new_hire_setup_tasks_new_hire_id_fkey(*)"
+        SUBMISSION_COLUMNS
     ).eq("id", submission_id).single().execute()
     return response.data
 
 
-def format_applicant_for_bot(record: Dict) -> Dict:
+# Deletes every ASCII non-digit in one C-level pass
+_NONDIGIT = str.maketrans("", "", "".join(chr(i) for i in range(128) if not chr(i).isdigit()))
+
+
+@dataclass(slots=True)
+class Applicant:
+    """One new hire, normalized into the values the portal form expects."""
+    first_name: str
+    last_name: str
+    dob: str  # MM/DD/YYYY
+    ssn4: str
+    email: str
+    phone: str  # Digits only
+    middle_name: str = ""
+    submission_id: Optional[str] = None
+
+
+def format_applicant_for_bot(record: Dict) -> Applicant:
     """Transform new_hire_submissions record to bot format."""
     dob_raw = record.get("date_of_birth", "")
     if dob_raw and isinstance(dob_raw, str) and "-" in dob_raw:
@@ -90,97 +223,198 @@ def format_applicant_for_bot(record: Dict) -> Dict:
         dob_formatted = dob_raw or ""
     
     phone_raw = record.get("applicant_phone", "") or ""
-    phone_clean = "".join(c for c in phone_raw if c.isdigit())
+    phone_clean = phone_raw.translate(_NONDIGIT)
+    if not phone_clean.isascii():
+        # Rare non-ASCII separators (non-breaking spaces, en dashes) survive the table
+        phone_clean = "".join(c for c in phone_clean if c.isdigit())
+    if len(phone_clean) == 11 and phone_clean.startswith("1"):
+        # The portal's phone field takes 10 digits; drop the US country code
+        phone_clean = phone_clean[1:]
     
-    return {
-        "first_name": record.get("first_name", ""),
-        "last_name": record.get("last_name", ""),
-        "middle_name": record.get("middle_name", "") or "",
-        "dob": dob_formatted,
-        "ssn4": record.get("ssn_last_4", ""),
-        "email": record.get("applicant_email", ""),
-        "phone": phone_clean,
-        "_submission_id": record.get("id"),
-    }
+    return Applicant(
+        first_name=record.get("first_name", ""),
+        last_name=record.get("last_name", ""),
+        middle_name=record.get("middle_name", "") or "",
+        dob=dob_formatted,
+        ssn4=record.get("ssn_last_4", ""),
+        email=record.get("applicant_email", ""),
+        phone=phone_clean,
+        submission_id=record.get("id"),
+    )
+
+
+_DOB_RE = re.compile(r"[0-9]{2}/[0-9]{2}/[0-9]{4}")
+_SSN4_RE = re.compile(r"[0-9]{4}")
+_PHONE_RE = re.compile(r"[0-9]{10}")
+_EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+
+def validate_applicant(applicant: Applicant) -> List[str]:
+    """Return what is wrong with an applicant's data (empty if it can be submitted)."""
+    errors = []
+    if not applicant.first_name or not applicant.last_name:
+        errors.append("missing name")
+    if not _DOB_RE.fullmatch(applicant.dob):
+        errors.append(f"bad DOB {applicant.dob!r}")
+    if not _SSN4_RE.fullmatch(applicant.ssn4 or ""):
+        errors.append("SSN4 is not 4 digits")
+    if not _PHONE_RE.fullmatch(applicant.phone):
+        errors.append(f"bad phone {applicant.phone!r}")
+    if not _EMAIL_RE.fullmatch(applicant.email or ""):
+        errors.append(f"bad email {applicant.email!r}")
+    return errors
 
 
 def mark_badge_request_sent(submission_id: str) -> bool:
     """Update new_hire_setup_tasks to mark airport badge request as sent."""
     client = get_supabase_client()
-    
-    response = client.table("new_hire_setup_tasks").select("id").eq(
-        "new_hire_id", submission_id
-    ).execute()
-    
+    now = datetime.now(timezone.utc).isoformat()
+
+    response = client.table("new_hire_setup_tasks").update({
+        "airport_badge_request_sent": True,
+        "airport_badge_request_sent_at": now,
+        "updated_at": now,
+    }).eq("new_hire_id", submission_id).execute()
+
     if not response.data:
-        print(f"[WARN] No setup_tasks record found for {submission_id}")
+        logger.warning(f"[WARN] No setup_tasks record found for {submission_id}")
         return False
-    
-    setup_task_id = response.data[0]["id"]
-    
-    update_response = client.table("new_hire_setup_tasks").update({
-        "airport_badge_request_sent": True,
-        "airport_badge_request_sent_at": datetime.utcnow().isoformat(),
-        "updated_at": datetime.utcnow().isoformat(),
-    }).eq("id", setup_task_id).execute()
-    
-    return len(update_response.data) > 0
+
+    return True
+
+
+def mark_badge_requests_sent(submission_ids: List[str]) -> int:
+    """Mark several airport badge requests as sent with a single update.
+
+    Falls back to one update per submission if the bulk update fails.
+    Returns the number of setup_tasks records marked.
+    """
+    if not submission_ids:
+        return 0
+
+    client = get_supabase_client()
+    now = datetime.now(timezone.utc).isoformat()
+    marked = set()
+
+    # The id list goes into the query string, so keep each request well under URL limits
+    for start in range(0, len(submission_ids), MARK_BATCH_SIZE):
+        batch = submission_ids[start:start + MARK_BATCH_SIZE]
+        try:
+            response = client.table("new_hire_setup_tasks").update({
+                "airport_badge_request_sent": True,
+                "airport_badge_request_sent_at": now,
+                "updated_at": now,
+            }).in_("new_hire_id", batch).execute()
+        except Exception as e:
+            logger.warning(f"[WARN] Bulk update failed ({e}) - marking individually")
+            marked.update(submission_id for submission_id in batch if mark_badge_request_sent(submission_id))
+            continue
+
+        batch_marked = {row.get("new_hire_id") for row in response.data}
+        for submission_id in batch:
+            if submission_id not in batch_marked:
+                logger.warning(f"[WARN] No setup_tasks record found for {submission_id}")
+        marked |= batch_marked
+    return len(marked)
 
 
 # =============================================================================
 # LOGIN
 # =============================================================================
 
-def login(page: Page) -> bool:
+def load_session() -> Optional[Dict]:
+    """Load the saved portal session, or None if there is no usable one."""
+    try:
+        with open(AUTH_STATE_PATH) as f:
+            session = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.info(f"[LOGIN] Ignoring unreadable session file: {e}")
+        return None
+    
+    if not session.get("dashboard_url") or not session.get("storage_state"):
+        return None
+    return session
+
+
+def save_session(storage_state: Dict, dashboard_url: str):
+    """Save the portal session so later runs can skip the login flow."""
+    # Session cookies are credentials - keep the file private to this user
+    fd = os.open(AUTH_STATE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    # The mode above only applies on creation; tighten a file left by an older run too
+    os.fchmod(fd, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump({"dashboard_url": dashboard_url, "storage_state": storage_state}, f)
+    logger.info(f"[LOGIN] Saved session to {AUTH_STATE_PATH}")
+
+
+async def login(page: Page) -> bool:
     """Log into the MyPITID portal."""
-    username = os.getenv("PITID_USERNAME")
-    password = os.getenv("PITID_PASSWORD")
+    username = SETTINGS.pitid_username
+    password = SETTINGS.pitid_password
     
     if not username or not password:
         raise ValueError("Missing PITID_USERNAME or PITID_PASSWORD")
     
-    print(f"[LOGIN] Navigating to {BASE_URL}")
-    page.goto(BASE_URL, wait_until="networkidle")
+    logger.info(f"[LOGIN] Navigating to {BASE_URL}")
+    await page.goto(BASE_URL, wait_until="domcontentloaded")
+    if "AlertSelfService" in page.url:
+        logger.info("[LOGIN] Session still valid - skipping sign in")
+        return True
     
-    print("[LOGIN] Clicking 'SIGN IN TO MYPITID'")
-    page.click("text=SIGN IN TO MYPITID", timeout=TIMEOUT_MEDIUM)
+    logger.info("[LOGIN] Clicking 'SIGN IN TO MYPITID'")
+    await page.click("text=SIGN IN TO MYPITID", timeout=TIMEOUT_MEDIUM)
     
-    print("[LOGIN] Waiting for login form...")
-    page.wait_for_load_state("networkidle")
+    logger.info("[LOGIN] Waiting for login form...")
+    await page.wait_for_load_state("domcontentloaded")
     
+    # A live SSO session sends us straight back to the portal instead of showing the form
+    username_selector = "input[type='email'], input[name='loginfmt'], #signInName"
     try:
-        username_input = page.locator("input[type='email'], input[name='loginfmt'], #signInName").first
-        username_input.wait_for(state="visible", timeout=TIMEOUT_MEDIUM)
-        print(f"[LOGIN] Entering username: {username}")
-        username_input.fill(username)
+        await page.wait_for_function(
+            "(sel) => location.pathname.includes('/AlertSelfService/') || !!document.querySelector(sel)",
+            arg=username_selector, timeout=TIMEOUT_MEDIUM, polling=100,
+        )
+    except Exception:
+        pass
+    if "AlertSelfService" in page.url:
+        logger.info("[LOGIN] Session still valid - skipping credentials")
+        return True
+    
+    try:
+        username_input = page.locator(username_selector).first
+        await username_input.wait_for(state="visible", timeout=TIMEOUT_MEDIUM)
+        logger.info(f"[LOGIN] Entering username: {username}")
+        await username_input.fill(username)
         
         next_btn = page.locator("input[type='submit'], button[type='submit'], #next").first
-        if next_btn.is_visible():
-            next_btn.click()
-            page.wait_for_load_state("networkidle")
+        if await next_btn.is_visible():
+            await next_btn.click()
+            await page.wait_for_load_state("domcontentloaded")
     except Exception as e:
-        print(f"[LOGIN] Username step error: {e}")
+        logger.info(f"[LOGIN] Username step error: {e}")
     
     try:
         password_input = page.locator("input[type='password'], #password").first
-        password_input.wait_for(state="visible", timeout=TIMEOUT_MEDIUM)
-        print("[LOGIN] Entering password")
-        password_input.fill(password)
+        await password_input.wait_for(state="visible", timeout=TIMEOUT_MEDIUM)
+        logger.info("[LOGIN] Entering password")
+        await password_input.fill(password)
         
         submit_btn = page.locator("input[type='submit'], button[type='submit'], #next").first
-        submit_btn.click()
+        await submit_btn.click()
     except Exception as e:
-        print(f"[LOGIN] Password step error: {e}")
+        logger.info(f"[LOGIN] Password step error: {e}")
         return False
     
-    print("[LOGIN] Waiting for dashboard...")
+    logger.info("[LOGIN] Waiting for dashboard...")
     try:
-        page.wait_for_url("**/AlertSelfService/**", timeout=TIMEOUT_LONG)
-        print("[LOGIN] Successfully logged in!")
+        await page.wait_for_url("**/AlertSelfService/**", wait_until="domcontentloaded", timeout=TIMEOUT_LONG)
+        logger.info("[LOGIN] Successfully logged in!")
         return True
     except:
         if "AlertSelfService" in page.url:
-            print("[LOGIN] Successfully logged in!")
+            logger.info("[LOGIN] Successfully logged in!")
             return True
         return False
 
@@ -189,24 +423,25 @@ def login(page: Page) -> bool:
 # NAVIGATION
 # =============================================================================
 
-def navigate_to_application_management(page: Page) -> bool:
+async def navigate_to_application_management(page: Page) -> bool:
     """Navigate to Application Management from dashboard."""
-    print("[NAV] Looking for Application Management tile...")
+    logger.info("[NAV] Looking for Application Management tile...")
     try:
         app_mgmt = page.locator("text=Application Management").first
-        app_mgmt.wait_for(state="visible", timeout=TIMEOUT_MEDIUM)
-        app_mgmt.click()
-        page.wait_for_load_state("networkidle")
-        print("[NAV] Entered Application Management")
+        await app_mgmt.wait_for(state="visible", timeout=TIMEOUT_MEDIUM)
+        await app_mgmt.click()
+        await page.wait_for_load_state("domcontentloaded")
+        await page.locator("text=Initiate").first.wait_for(state="visible", timeout=TIMEOUT_MEDIUM)
+        logger.info("[NAV] Entered Application Management")
         return True
     except Exception as e:
-        print(f"[NAV] Error: {e}")
+        logger.error(f"[NAV] Error: {e}")
         return False
 
 
-def initiate_new_application(page: Page) -> bool:
+async def initiate_new_application(page: Page) -> bool:
     """Click to start a new badge application."""
-    print("[NAV] Looking for 'Initiate a New Badge Application' button...")
+    logger.info("[NAV] Looking for 'Initiate a New Badge Application' button...")
     
     btn_selectors = [
         "text=Initiate a New Badge Application",
@@ -218,16 +453,15 @@ def initiate_new_application(page: Page) -> bool:
     for selector in btn_selectors:
         try:
             btn = page.locator(selector).first
-            if btn.is_visible(timeout=2000):
-                btn.click()
-                print(f"[NAV] Clicked: {selector}")
-                page.wait_for_load_state("networkidle")
-                page.wait_for_timeout(3000)
+            if await btn.is_visible(timeout=2000):
+                await btn.click()
+                logger.info(f"[NAV] Clicked: {selector}")
+                await page.wait_for_load_state("domcontentloaded")
                 return True
         except:
             continue
     
-    print("[NAV] Could not find new application button")
+    logger.info("[NAV] Could not find new application button")
     return False
 
 
@@ -235,145 +469,263 @@ def initiate_new_application(page: Page) -> bool:
 # FORM FILLING
 # =============================================================================
 
-def fill_duplicate_check(page: Page, dob: str, ssn4: str) -> bool:
+async def _wait_for_field_ready(
+    locator: Locator, value: Optional[str] = None, state: str = "visible", timeout: int = TIMEOUT_SHORT
+) -> bool:
+    """Wait for a field to hold `value` (or reach `state`) instead of sleeping a fixed time."""
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError, expect
+    
+    try:
+        if value is not None:
+            await expect(locator).to_have_value(value, timeout=timeout)
+        else:
+            await locator.wait_for(state=state, timeout=timeout)
+        return True
+    except (AssertionError, PlaywrightTimeoutError):
+        return False
+
+
+_SELECTOR_CACHE: Dict[str, str] = {}
+_LAYOUT_HASHES: Dict[str, str] = {}  # Form name -> hash of its field labels
+_LAYOUTS_CHECKED = set()  # Forms already compared against their hash this run
+
+
+def load_selector_cache():
+    """Load selectors (and the form layouts they were found on) from previous runs."""
+    _LAYOUTS_CHECKED.clear()
+    try:
+        with open(SELECTOR_CACHE_PATH) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return
+    if "selectors" not in cache:
+        cache = {"selectors": cache}  # Older files held only the selectors
+    # Entries keyed by a raw path with ids in it would never be hit again
+    _SELECTOR_CACHE.update(
+        (key, sel) for key, sel in cache.get("selectors", {}).items()
+        if _url_template(key.partition("|")[0]) == key.partition("|")[0]
+    )
+    _LAYOUT_HASHES.update(cache.get("layouts", {}))
+
+
+def save_selector_cache():
+    """Persist remembered selectors for the next run."""
+    try:
+        with open(SELECTOR_CACHE_PATH, "w") as f:
+            json.dump({"layouts": _LAYOUT_HASHES, "selectors": _SELECTOR_CACHE}, f, indent=2, sort_keys=True)
+    except OSError as e:
+        logger.warning(f"[FORM] WARNING: Could not save selector cache: {e}")
+
+
+_ID_SEGMENT_RE = re.compile(r"[0-9]+|[0-9a-f]{8}(-[0-9a-f]{4}){3}-[0-9a-f]{12}|[0-9a-f]{24,}", re.IGNORECASE)
+
+
+def _url_template(url: str) -> str:
+    """Return the URL's path with id segments replaced, so each route shares one set of selectors."""
+    return "/".join(":id" if _ID_SEGMENT_RE.fullmatch(seg) else seg for seg in urlsplit(url).path.split("/"))
+
+
+def _selector_cache_key(page: Page, field_key: str) -> str:
+    return f"{_url_template(page.url)}|{field_key}"
+
+
+async def check_form_layout(page: Page, name: str, root: str = "body"):
+    """Forget this page's cached selectors if the form under `root` has different fields than last time."""
+    if name in _LAYOUTS_CHECKED:
+        return
+    _LAYOUTS_CHECKED.add(name)
+    try:
+        labels = await page.evaluate('''(root) => {
+            const container = document.querySelector(root) || document.body;
+            return [...container.querySelectorAll('mat-form-field')]
+                .map(field => (field.querySelector('mat-label') || field).innerText.trim())
+                .join('\\n');
+        }''', root)
+    except Exception:
+        return
+    
+    digest = hashlib.sha256(labels.encode()).hexdigest()
+    if _LAYOUT_HASHES.get(name, digest) != digest:
+        logger.info(f"[FORM] The {name} form changed since the last run - rediscovering selectors")
+        prefix = f"{_url_template(page.url)}|"
+        for key in [key for key in _SELECTOR_CACHE if key.startswith(prefix)]:
+            del _SELECTOR_CACHE[key]
+    _LAYOUT_HASHES[name] = digest
+
+
+def forget_selector(page: Page, field_key: str):
+    """Drop a remembered selector that stopped working."""
+    _SELECTOR_CACHE.pop(_selector_cache_key(page, field_key), None)
+
+
+async def _match_visibility(page: Page, selector: str) -> List[bool]:
+    """Return whether each element the selector matches is visible, in one round trip."""
+    try:
+        return await page.locator(selector).evaluate_all('''els => els.map(el => {
+            const rect = el.getBoundingClientRect();
+            return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+        })''')
+    except Exception:
+        return []
+
+
+async def resolve(page: Page, field_key: str, candidates: List[str]) -> Optional[Locator]:
+    """Return the first visible candidate for a field, trying the last selector that worked first."""
+    key = _selector_cache_key(page, field_key)
+    cached = _SELECTOR_CACHE.get(key)
+    if cached in candidates:
+        # A hit is one round trip; discovery pays one per candidate it has to try
+        if await _match_visibility(page, cached) == [True]:
+            return page.locator(cached).first
+        _SELECTOR_CACHE.pop(key, None)
+    for sel in candidates:
+        visible = await _match_visibility(page, sel)
+        if visible and visible[0]:
+            # An ambiguous fallback isn't remembered, so it can't jump ahead of specific candidates
+            if len(visible) == 1:
+                _SELECTOR_CACHE[key] = sel
+            return page.locator(sel).first
+    return None
+
+
+async def fill_field(
+    page: Page, field_key: str, candidates: List[str], value: str, timeout: int = TIMEOUT_SHORT
+) -> bool:
+    """Fill a text field found via `resolve` and wait for it to hold the value."""
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    
+    inp = await resolve(page, field_key, candidates)
+    if inp is None:
+        return False
+    try:
+        await inp.click(force=True)
+        await inp.fill(value)
+    except PlaywrightTimeoutError:
+        forget_selector(page, field_key)
+        return False
+    await _wait_for_field_ready(inp, value, timeout=timeout)
+    return True
+
+
+async def fill_duplicate_check(page: Page, dob: str, ssn4: str) -> bool:
     """Fill the duplicate check modal with DOB and last 4 SSN."""
-    print("[FORM] Waiting for duplicate check modal...")
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    
+    logger.info("[FORM] Waiting for duplicate check modal...")
     
     try:
-        page.wait_for_load_state("networkidle")
-        page.wait_for_timeout(2000)
+        await page.wait_for_load_state("domcontentloaded")
         
-        # Wait for modal
-        modal_selectors = ["text=Duplicate Check", "text=Personal Information", "input[placeholder*='MM/DD/YYYY']"]
-        modal_found = False
-        for selector in modal_selectors:
-            try:
-                page.wait_for_selector(selector, timeout=TIMEOUT_LONG)
-                print(f"[FORM] Found modal element: {selector}")
-                modal_found = True
-                break
-            except:
-                continue
-        
-        if not modal_found:
-            print("[FORM] Could not find duplicate check modal")
+        # Wait for whichever modal marker shows up first
+        try:
+            await page.wait_for_function('''() =>
+                document.querySelector('mat-dialog-container input[placeholder*="MM/DD/YYYY"]')
+                || /Duplicate Check|Personal Information/.test(document.body.innerText)
+            ''', timeout=TIMEOUT_LONG, polling=100)
+        except PlaywrightTimeoutError:
+            logger.info("[FORM] Could not find duplicate check modal")
             return False
-        
-        # Parse DOB
-        parts = dob.split("/")
-        month, day, year = int(parts[0]), int(parts[1]), int(parts[2])
-        print(f"[FORM] Parsed date: {month}/{day}/{year}")
+        logger.info("[FORM] Found duplicate check modal")
+        await check_form_layout(page, "duplicate check", "mat-dialog-container")
         
         # Fill DOB via JavaScript - target the modal specifically
-        print("[FORM] Setting DOB via JavaScript...")
-        js_result = page.evaluate(f'''() => {{
+        logger.info("[FORM] Setting DOB via JavaScript...")
+        js_result = await page.evaluate('''(dob) => {
             const modal = document.querySelector('mat-dialog-container, .mat-dialog-container');
-            if (!modal) return {{ success: false, error: 'no modal' }};
+            if (!modal) return { success: false, error: 'no modal' };
             const input = modal.querySelector('input[placeholder*="MM/DD/YYYY"]');
-            if (!input) return {{ success: false, error: 'no input' }};
+            if (!input) return { success: false, error: 'no input' };
             input.removeAttribute('readonly');
             input.removeAttribute('disabled');
-            input.value = "{dob}";
-            input.dispatchEvent(new Event('input', {{ bubbles: true }}));
-            input.dispatchEvent(new Event('change', {{ bubbles: true }}));
-            input.dispatchEvent(new Event('blur', {{ bubbles: true }}));
-            return {{ success: true, value: input.value }};
-        }}''')
+            input.value = dob;
+            input.dispatchEvent(new Event('input', { bubbles: true }));
+            input.dispatchEvent(new Event('change', { bubbles: true }));
+            input.dispatchEvent(new Event('blur', { bubbles: true }));
+            return { success: true, value: input.value };
+        }''', dob)
         
         if js_result and js_result.get('success'):
-            print(f"[FORM] Set DOB: {dob}")
+            logger.info(f"[FORM] Set DOB: {dob}")
         else:
-            print(f"[FORM] WARNING: DOB JavaScript failed: {js_result}")
+            logger.warning(f"[FORM] WARNING: DOB JavaScript failed: {js_result}")
         
-        page.wait_for_timeout(500)
+        await page.wait_for_timeout(500)
         
         # Fill SSN4 - target the modal specifically
-        print("[FORM] Filling SSN4...")
-        ssn_filled = False
+        logger.info("[FORM] Filling SSN4...")
         ssn_selectors = [
             "mat-dialog-container input[placeholder*='Last 4']",
             "mat-dialog-container input[id*='ssn' i]",
             "input[placeholder*='Last 4']",
         ]
-        for selector in ssn_selectors:
-            try:
-                ssn_input = page.locator(selector).first
-                if ssn_input.is_visible(timeout=2000):
-                    ssn_input.click(force=True)
-                    page.wait_for_timeout(200)
-                    ssn_input.fill(ssn4)
-                    print(f"[FORM] Filled SSN4: {ssn4}")
-                    ssn_filled = True
-                    break
-            except:
-                continue
-        
-        if not ssn_filled:
-            print("[FORM] WARNING: Could not fill SSN4")
+        if await fill_field(page, "ssn4", ssn_selectors, ssn4):
+            logger.info(f"[FORM] Filled SSN4: {ssn4}")
+        else:
+            logger.warning("[FORM] WARNING: Could not fill SSN4")
         
-        page.wait_for_timeout(500)
+        await page.wait_for_timeout(500)
         
         # Click Continue button inside the modal
-        print("[FORM] Clicking Continue...")
+        logger.info("[FORM] Clicking Continue...")
         continue_clicked = False
         
         try:
             # Try clicking with force
             continue_btn = page.locator("mat-dialog-container button:has-text('Continue')").first
-            if continue_btn.is_visible(timeout=2000):
-                continue_btn.click(force=True)
+            if await continue_btn.is_visible(timeout=2000):
+                await continue_btn.click(force=True)
                 continue_clicked = True
-                print("[FORM] Clicked Continue (in modal)")
+                logger.info("[FORM] Clicked Continue (in modal)")
         except:
             pass
         
         if not continue_clicked:
             try:
-                page.click("button:has-text('Continue')", force=True)
+                await page.click("button:has-text('Continue')", force=True)
                 continue_clicked = True
-                print("[FORM] Clicked Continue (global)")
+                logger.info("[FORM] Clicked Continue (global)")
             except:
                 pass
         
         if not continue_clicked:
             # Use JavaScript to click
-            page.evaluate('''() => {
+            await page.evaluate('''() => {
                 const btn = document.querySelector('button[type="submit"], button.mat-raised-button');
                 if (btn) btn.click();
             }''')
-            print("[FORM] Clicked Continue via JavaScript")
+            logger.info("[FORM] Clicked Continue via JavaScript")
         
-        page.wait_for_timeout(3000)
+        await page.wait_for_timeout(3000)
         
         # Check for error messages in modal (duplicate found, validation error, etc.)
         try:
             error_in_modal = page.locator("mat-dialog-container .mat-error, mat-dialog-container mat-error").first
-            if error_in_modal.is_visible(timeout=1000):
-                error_text = error_in_modal.inner_text()
+            if await error_in_modal.is_visible(timeout=1000):
+                error_text = await error_in_modal.inner_text()
                 if error_text.strip():
-                    print(f"[FORM] ERROR in modal: {error_text}")
-                    page.screenshot(path="duplicate_check_error.png")
+                    logger.error(f"[FORM] ERROR in modal: {error_text}")
+                    await page.screenshot(path="duplicate_check_error.png")
                     return False
         except:
             pass
         
         # Check if "Record found" popup appeared (duplicate exists)
         try:
-            if page.locator("text=Record found").is_visible(timeout=1000):
-                print("[FORM] DUPLICATE FOUND - applicant already exists in system")
-                page.screenshot(path="duplicate_found.png")
+            if await page.locator("text=Record found").is_visible(timeout=1000):
+                logger.info("[FORM] DUPLICATE FOUND - applicant already exists in system")
+                await page.screenshot(path="duplicate_found.png")
                 # This might not be an error - they might need to continue with existing record
                 # For now, try clicking Continue anyway
                 try:
-                    page.click("button:has-text('Continue')", force=True)
-                    page.wait_for_timeout(2000)
+                    await page.click("button:has-text('Continue')", force=True)
+                    await page.wait_for_timeout(2000)
                 except:
                     pass
         except:
             pass
         
         # CRITICAL: Wait for modal to close
-        print("[FORM] Waiting for modal to close...")
+        logger.info("[FORM] Waiting for modal to close...")
         
         modal_closed = False
         
@@ -381,117 +733,149 @@ def fill_duplicate_check(page: Page, dob: str, ssn4: str) -> bool:
         for attempt in range(3):
             try:
                 # Check if modal is gone
-                if not page.locator("mat-dialog-container").is_visible(timeout=2000):
-                    print("[FORM] Modal closed successfully")
+                if not await page.locator("mat-dialog-container").is_visible(timeout=2000):
+                    logger.info("[FORM] Modal closed successfully")
                     modal_closed = True
                     break
             except:
                 modal_closed = True
                 break
             
-            print(f"[FORM] Modal still open, attempt {attempt + 1}")
-            page.wait_for_timeout(1000)
+            logger.info(f"[FORM] Modal still open, attempt {attempt + 1}")
+            await page.wait_for_timeout(1000)
         
         # Force close if still open
         if not modal_closed:
-            print("[FORM] Modal still open, forcing close...")
+            logger.info("[FORM] Modal still open, forcing close...")
             
             # Try Escape
-            page.keyboard.press("Escape")
-            page.wait_for_timeout(1000)
+            await page.keyboard.press("Escape")
+            await page.wait_for_timeout(1000)
             
             # JavaScript removal
-            page.evaluate('''() => {
+            await page.evaluate('''() => {
                 document.querySelectorAll('.cdk-overlay-backdrop').forEach(el => el.remove());
                 document.querySelectorAll('mat-dialog-container').forEach(el => el.remove());
                 const overlay = document.querySelector('.cdk-overlay-container');
                 if (overlay) overlay.innerHTML = '';
             }''')
-            page.wait_for_timeout(1000)
+            await page.wait_for_timeout(1000)
         
-        page.wait_for_load_state("networkidle")
-        page.wait_for_timeout(2000)
-        print("[FORM] Duplicate check completed")
+        # fill_application_form waits for its own section header next
+        await page.wait_for_load_state("domcontentloaded")
+        logger.info("[FORM] Duplicate check completed")
         return True
         
     except Exception as e:
-        print(f"[FORM] Duplicate check error: {e}")
-        page.screenshot(path="duplicate_check_exception.png")
+        logger.info(f"[FORM] Duplicate check error: {e}")
+        await page.screenshot(path="duplicate_check_exception.png")
         return False
 
 
-def fill_autocomplete_field(page: Page, field_name: str, trigger: str) -> bool:
+async def _find_form_field_input(page: Page, labels: List[str]) -> Optional[ElementHandle]:
+    """Find the visible input of the first mat-form-field mentioning any of `labels`, in one round trip."""
+    handle = await page.evaluate_handle('''(labels) => {
+        for (const field of document.querySelectorAll('mat-form-field')) {
+            if (!labels.some(label => field.innerText.includes(label))) continue;
+            const input = field.querySelector('input');
+            if (input && input.getClientRects().length) return input;
+        }
+        return null;
+    }''', labels)
+    element = handle.as_element()
+    if element is None:
+        await handle.dispose()
+    return element
+
+
+async def _fill_text_fields(page: Page, fields: Dict[str, Tuple[str, str]]) -> Dict[str, str]:
+    """Fill {key: (label, value)} text inputs in one round trip; returns the value each input ended up with.
+    
+    Keys whose mat-form-field could not be found, or whose form control rejected
+    the value, are left out, so the caller can fall back to `fill_field` for them.
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    
+    try:
+        filled = await page.evaluate('''(fields) => {
+            const formFields = [...document.querySelectorAll('mat-form-field')];
+            const result = {};
+            for (const [key, [label, value]] of Object.entries(fields)) {
+                const needle = label.toLowerCase();
+                const field = formFields.find(f => {
+                    const input = f.querySelector('input');
+                    return input && input.getClientRects().length && f.innerText.toLowerCase().includes(needle);
+                });
+                if (!field) continue;
+                const input = field.querySelector('input');
+                input.dataset.pitField = key;
+                input.focus();
+                input.value = value;
+                input.dispatchEvent(new Event('input', {bubbles: true}));
+                input.dispatchEvent(new Event('change', {bubbles: true}));
+                input.blur();
+                result[key] = input.value;
+            }
+            return result;
+        }''', fields)
+    except Exception as e:
+        logger.warning(f"[FORM] WARNING: Batch fill failed ({e}) - filling fields one by one")
+        return {}
+    if not filled:
+        return filled
+    
+    # Assigning .value proves nothing about the FormControl, so wait once for Angular to
+    # mark every filled input dirty (and finish any async validators), then drop the invalid ones
+    try:
+        handle = await page.wait_for_function('''(keys) => {
+            const accepted = {};
+            for (const key of keys) {
+                const input = document.querySelector(`input[data-pit-field="${key}"]`);
+                if (!input) continue;
+                const bound = [...input.classList].some(c => c.startsWith('ng-'));
+                if (bound && (!input.classList.contains('ng-dirty') || input.classList.contains('ng-pending'))) return null;
+                if (!input.classList.contains('ng-invalid')) accepted[key] = input.value;
+            }
+            return accepted;
+        }''', arg=list(filled), timeout=TIMEOUT_SHORT, polling=100)
+        return await handle.json_value()
+    except PlaywrightTimeoutError:
+        logger.warning("[FORM] WARNING: Form did not accept the batch fill - filling fields one by one")
+        return {}
+
+
+async def fill_autocomplete_field(page: Page, field_name: str, trigger: str) -> bool:
     """Fill an autocomplete field and select Atlas."""
-    print(f"[FORM] === Filling {field_name} field ===")
+    logger.info(f"[FORM] === Filling {field_name} field ===")
     
     try:
         inp = None
         
         if field_name == "sponsor":
-            for sel in ["input[placeholder*='list down all relevant Sponsors']", "input[placeholder*='Sponsor']"]:
-                try:
-                    inp = page.locator(sel).first
-                    if inp.is_visible(timeout=1000):
-                        break
-                    inp = None
-                except:
-                    inp = None
+            inp = await resolve(
+                page, "sponsor",
+                ["input[placeholder*='list down all relevant Sponsors']", "input[placeholder*='Sponsor']"],
+            )
         
         elif field_name == "access":
-            try:
-                inp = page.locator("mat-form-field:has-text('Access') input").first
-                if not inp.is_visible(timeout=1000):
-                    inp = None
-            except:
-                inp = None
-            
-            if not inp:
-                form_fields = page.locator("mat-form-field").all()
-                for ff in form_fields:
-                    try:
-                        if "Access" in ff.inner_text(timeout=300):
-                            inp = ff.locator("input").first
-                            if inp.is_visible(timeout=300):
-                                break
-                            inp = None
-                    except:
-                        continue
+            inp = await _find_form_field_input(page, ["Access"])
         
         elif field_name == "employer":
-            try:
-                inp = page.locator("mat-form-field:has-text('Employer') input").first
-                if not inp.is_visible(timeout=1000):
-                    inp = None
-            except:
-                inp = None
-            
-            if not inp:
-                form_fields = page.locator("mat-form-field").all()
-                for ff in form_fields:
-                    try:
-                        text = ff.inner_text(timeout=300)
-                        if "Employer" in text or "Agency" in text:
-                            inp = ff.locator("input").first
-                            if inp.is_visible(timeout=300):
-                                break
-                            inp = None
-                    except:
-                        continue
+            inp = await _find_form_field_input(page, ["Employer", "Agency"])
         
         if not inp:
-            print(f"[FORM] ERROR: Could not find {field_name}")
+            logger.error(f"[FORM] ERROR: Could not find {field_name}")
             return False
         
-        inp.scroll_into_view_if_needed()
-        page.wait_for_timeout(500)
+        await inp.scroll_into_view_if_needed()
         
         # Try clicking - use JavaScript if force click fails
         try:
-            inp.click(force=True, timeout=5000)
+            await inp.click(force=True, timeout=5000)
         except:
-            print(f"[FORM] Force click failed for {field_name}, using JavaScript...")
+            logger.info(f"[FORM] Force click failed for {field_name}, using JavaScript...")
             # Use JavaScript to focus and interact
-            page.evaluate('''(selector) => {
+            await page.evaluate('''(selector) => {
                 const input = document.querySelector(selector);
                 if (input) {
                     input.focus();
@@ -499,364 +883,231 @@ def fill_autocomplete_field(page: Page, field_name: str, trigger: str) -> bool:
                 }
             }''', f"input[placeholder*='Sponsor'], input[id='Organization'], input[id='SponsorCompany'], mat-form-field:has-text('{field_name}') input")
         
-        page.wait_for_timeout(500)
-        inp.fill("")
-        page.wait_for_timeout(300)
-        inp.type(trigger, delay=150)
-        page.wait_for_timeout(2500)
+        # Set the value and fire the events Angular listens for, rather than typing per key
+        await inp.evaluate('''(el, value) => {
+            el.value = value;
+            el.dispatchEvent(new Event('input', { bubbles: true }));
+            el.dispatchEvent(new Event('change', { bubbles: true }));
+        }''', trigger)
+        options_panel = page.locator("mat-option").first
+        if not await _wait_for_field_ready(options_panel, timeout=1000):
+            await inp.press("ArrowDown")  # Force the mat-autocomplete panel open
+            await _wait_for_field_ready(options_panel, timeout=3000)
         
         # Click Atlas option
         option_selectors = ["mat-option:has-text('Atlas')", ".mat-option:has-text('Atlas')"]
         for opt_sel in option_selectors:
             try:
-                options = page.locator(opt_sel).all()
+                options = await page.locator(opt_sel).all()
                 for opt in options:
-                    if opt.is_visible(timeout=500):
-                        opt.click(force=True)  # Force click
-                        print(f"[FORM] Selected Atlas for {field_name}")
-                        page.wait_for_timeout(1000)
+                    if await opt.is_visible(timeout=500):
+                        await opt.click(force=True)  # Force click
+                        logger.info(f"[FORM] Selected Atlas for {field_name}")
+                        await _wait_for_field_ready(options_panel, state="hidden")
                         return True
             except:
                 continue
         
         # Fallback: keyboard
-        page.keyboard.press("ArrowDown")
-        page.wait_for_timeout(500)
-        page.keyboard.press("Enter")
-        page.wait_for_timeout(1000)
+        await page.keyboard.press("ArrowDown")
+        await page.keyboard.press("Enter")
+        await _wait_for_field_ready(options_panel, state="hidden")
         return True
         
     except Exception as e:
-        print(f"[FORM] Autocomplete error ({field_name}): {e}")
+        logger.info(f"[FORM] Autocomplete error ({field_name}): {e}")
         return False
 
 
-def fill_application_form(page: Page, applicant: dict, submit: bool = False) -> bool:
+async def fill_application_form(page: Page, applicant: Applicant, submit: bool = False) -> bool:
     """Fill out the main application form."""
-    print("[FORM] Filling application form...")
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+    
+    logger.info("[FORM] Filling application form...")
     
     try:
-        page.wait_for_selector("text=Applicant Name and Contact Information", timeout=TIMEOUT_MEDIUM)
-        page.wait_for_timeout(1000)
-        
-        # First Name
-        print("[FORM] Filling First Name...")
-        for sel in ["mat-form-field:has-text('First Name') input", "input[id*='first' i]"]:
-            try:
-                inp = page.locator(sel).first
-                if inp.is_visible(timeout=1000):
-                    inp.click(force=True)
-                    inp.fill(applicant["first_name"])
-                    print(f"[FORM] First Name: {applicant['first_name']}")
-                    break
-            except:
-                continue
-        
-        page.wait_for_timeout(300)
-        
-        # Last Name
-        print("[FORM] Filling Last Name...")
-        for sel in ["mat-form-field:has-text('Last name') input", "mat-form-field:has-text('Last Name') input"]:
-            try:
-                inp = page.locator(sel).first
-                if inp.is_visible(timeout=1000):
-                    inp.click(force=True)
-                    inp.fill(applicant["last_name"])
-                    print(f"[FORM] Last Name: {applicant['last_name']}")
-                    break
-            except:
-                continue
-        
-        page.wait_for_timeout(300)
-        
-        # Middle Name (optional)
-        if applicant.get("middle_name"):
-            for sel in ["mat-form-field:has-text('Middle') input"]:
-                try:
-                    inp = page.locator(sel).first
-                    if inp.is_visible(timeout=1000):
-                        inp.click(force=True)
-                        inp.fill(applicant["middle_name"])
-                        print(f"[FORM] Middle Name: {applicant['middle_name']}")
-                        break
-                except:
-                    continue
-        
-        page.wait_for_timeout(300)
-        
-        # Email
-        print("[FORM] Filling Email...")
-        for sel in ["mat-form-field:has-text('Email') input", "input[type='email']"]:
-            try:
-                inp = page.locator(sel).first
-                if inp.is_visible(timeout=1000):
-                    inp.click(force=True)
-                    inp.fill(applicant["email"])
-                    print(f"[FORM] Email: {applicant['email']}")
-                    break
-            except:
-                continue
-        
-        page.wait_for_timeout(300)
-        
-        # Phone
-        print("[FORM] Filling Phone...")
-        for sel in ["mat-form-field:has-text('Phone') input", "input[type='tel']"]:
-            try:
-                inp = page.locator(sel).first
-                if inp.is_visible(timeout=1000):
-                    inp.click(force=True)
-                    inp.fill(applicant["phone"])
-                    print(f"[FORM] Phone: {applicant['phone']}")
-                    break
-            except:
+        await page.wait_for_selector("text=Applicant Name and Contact Information", timeout=TIMEOUT_MEDIUM)
+        await _wait_for_field_ready(page.locator("mat-form-field input").first)
+        await check_form_layout(page, "application")
+        
+        # (key, log label, form-field label, fallback selectors, value)
+        text_fields = [
+            ("first_name", "First Name", "First Name",
+             ["mat-form-field:has-text('First Name') input", "input[id*='first' i]"], applicant.first_name),
+            ("last_name", "Last Name", "Last Name",
+             ["mat-form-field:has-text('Last name') input", "mat-form-field:has-text('Last Name') input"], applicant.last_name),
+            ("email", "Email", "Email",
+             ["mat-form-field:has-text('Email') input", "input[type='email']"], applicant.email),
+            ("phone", "Phone", "Phone",
+             ["mat-form-field:has-text('Phone') input", "input[type='tel']"], applicant.phone),
+        ]
+        if applicant.middle_name:  # Optional
+            text_fields.insert(2, (
+                "middle_name", "Middle Name", "Middle",
+                ["mat-form-field:has-text('Middle') input"], applicant.middle_name,
+            ))
+        
+        logger.info("[FORM] Filling name and contact fields...")
+        filled = await _fill_text_fields(page, {key: (label, value) for key, _, label, _, value in text_fields})
+        
+        for key, name, _, selectors, value in text_fields:
+            actual = filled.get(key)
+            # An input mask may reformat the phone digits
+            if actual == value or (key == "phone" and actual is not None and actual.translate(_NONDIGIT) == value):
+                logger.info(f"[FORM] {name}: {value}")
                 continue
+            logger.info(f"[FORM] Filling {name}...")
+            if await fill_field(page, key, selectors, value, timeout=1000 if key == "phone" else TIMEOUT_SHORT):
+                logger.info(f"[FORM] {name}: {value}")
         
-        page.wait_for_timeout(500)
-        page.evaluate("window.scrollBy(0, 400)")
-        page.wait_for_timeout(1000)
+        await page.evaluate("window.scrollBy(0, 400)")
         
         # Sponsor, Access Groups, Employer
-        fill_autocomplete_field(page, "sponsor", "**")
-        page.wait_for_timeout(1500)
-        fill_autocomplete_field(page, "access", "**")
-        page.wait_for_timeout(1500)
-        fill_autocomplete_field(page, "employer", "**")
-        page.wait_for_timeout(1500)
+        await fill_autocomplete_field(page, "sponsor", "**")
+        await fill_autocomplete_field(page, "access", "**")
+        await fill_autocomplete_field(page, "employer", "**")
         
         # Scroll and select Badge Type
-        page.evaluate("window.scrollBy(0, 400)")
-        page.wait_for_timeout(1000)
+        await page.evaluate("window.scrollBy(0, 400)")
         
-        print("[FORM] Selecting Badge Type: Sterile Area")
+        logger.info("[FORM] Selecting Badge Type: Sterile Area")
         try:
-            for sel in ["mat-form-field:has-text('Badge Type') mat-select", "mat-select[id*='badge' i]"]:
-                try:
-                    dropdown = page.locator(sel).first
-                    if dropdown.is_visible(timeout=1000):
-                        dropdown.click(force=True)
-                        page.wait_for_timeout(500)
-                        page.locator("mat-option:has-text('Sterile Area')").first.click(force=True)
-                        print("[FORM] Selected 'Sterile Area'")
-                        break
-                except:
-                    continue
+            dropdown = await resolve(
+                page, "badge_type",
+                ["mat-form-field:has-text('Badge Type') mat-select", "mat-select[id*='badge' i]"],
+            )
+            if dropdown:
+                await dropdown.click(force=True)
+                await page.locator("mat-option:has-text('Sterile Area')").first.click(force=True)
+                logger.info("[FORM] Selected 'Sterile Area'")
+        except PlaywrightTimeoutError:
+            forget_selector(page, "badge_type")
         except:
             pass
         
         # Scroll and check certification
-        print("[FORM] Scrolling to bottom for checkbox...")
-        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        page.wait_for_timeout(2000)  # Wait 2 seconds after scroll
-        
-        print("[FORM] Looking for certification checkbox...")
-        page.wait_for_timeout(1000)
-        
-        # Take screenshot to see checkbox state
-        page.screenshot(path="before_checkbox.png")
-        
-        checkbox_clicked = False
-        
-        # Method 1: Find checkbox by the certification text and click it
-        try:
-            cert_checkbox = page.locator("mat-checkbox:has-text('certify')").first
-            if cert_checkbox.is_visible(timeout=3000):
-                print("[FORM] Found checkbox with 'certify' text")
-                page.wait_for_timeout(500)
-                cert_checkbox.scroll_into_view_if_needed()
-                page.wait_for_timeout(500)
-                cert_checkbox.click(force=True)
-                page.wait_for_timeout(1000)
-                print("[FORM] Clicked certification checkbox")
-                checkbox_clicked = True
-        except Exception as e:
-            print(f"[FORM] Certify checkbox method failed: {e}")
-        
-        # Method 2: Click the mat-checkbox container
-        if not checkbox_clicked:
-            try:
-                checkbox = page.locator("mat-checkbox").first
-                if checkbox.is_visible(timeout=2000):
-                    print("[FORM] Found mat-checkbox")
-                    checkbox.scroll_into_view_if_needed()
-                    page.wait_for_timeout(500)
-                    
-                    # Check if already checked
-                    class_attr = checkbox.get_attribute("class") or ""
-                    if "mat-checkbox-checked" not in class_attr:
-                        checkbox.click(force=True)
-                        page.wait_for_timeout(1000)
-                        print("[FORM] Clicked mat-checkbox")
-                        checkbox_clicked = True
-                    else:
-                        print("[FORM] Checkbox already checked")
-                        checkbox_clicked = True
-            except Exception as e:
-                print(f"[FORM] mat-checkbox click failed: {e}")
-        
-        # Method 3: Click the label inside mat-checkbox
-        if not checkbox_clicked:
+        logger.info("[FORM] Scrolling to bottom for checkbox...")
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        
+        logger.info("[FORM] Looking for certification checkbox...")
+        await _wait_for_field_ready(page.locator("mat-checkbox").first)
+        
+        # Tick the box in one round trip: click the real <input> and report its state
+        checked = await page.evaluate('''() => {
+            const boxes = [...document.querySelectorAll('mat-checkbox')];
+            const cb = boxes.find(el => /certify/i.test(el.innerText)) || boxes[0];
+            if (!cb) return false;
+            cb.scrollIntoView({ block: 'center' });
+            const input = cb.querySelector('input[type="checkbox"]');
+            if (!input) return false;
+            if (!input.checked) input.click();
+            return input.checked;
+        }''')
+        
+        if not checked:
+            logger.info("[FORM] JavaScript click did not check the box, trying coordinate click...")
             try:
-                label = page.locator("mat-checkbox label").first
-                if label.is_visible(timeout=2000):
-                    print("[FORM] Found checkbox label")
-                    label.scroll_into_view_if_needed()
-                    page.wait_for_timeout(500)
-                    label.click(force=True)
-                    page.wait_for_timeout(1000)
-                    print("[FORM] Clicked checkbox label")
-                    checkbox_clicked = True
-            except Exception as e:
-                print(f"[FORM] Label click failed: {e}")
-        
-        # Method 4: Use JavaScript to check it
-        if not checkbox_clicked:
-            try:
-                print("[FORM] Trying JavaScript method...")
-                page.evaluate('''() => {
-                    const checkbox = document.querySelector('mat-checkbox');
-                    if (checkbox) {
-                        checkbox.scrollIntoView();
-                        const input = checkbox.querySelector('input[type="checkbox"]');
-                        if (input && !input.checked) {
-                            input.click();
-                        }
-                        // Also click the checkbox container
-                        checkbox.click();
-                    }
-                }''')
-                page.wait_for_timeout(1000)
-                print("[FORM] Used JavaScript to check checkbox")
-                checkbox_clicked = True
-            except Exception as e:
-                print(f"[FORM] JavaScript checkbox failed: {e}")
-        
-        # Method 5: Try clicking by coordinates
-        if not checkbox_clicked:
-            try:
-                print("[FORM] Trying coordinate click...")
-                checkbox = page.locator("mat-checkbox").first
-                box = checkbox.bounding_box()
+                box = await page.locator("mat-checkbox").first.bounding_box()
                 if box:
                     # Click in the middle of the checkbox
-                    page.mouse.click(box['x'] + 15, box['y'] + box['height']/2)
-                    page.wait_for_timeout(1000)
-                    print("[FORM] Clicked checkbox by coordinates")
-                    checkbox_clicked = True
+                    await page.mouse.click(box['x'] + 15, box['y'] + box['height']/2)
+                checked = await _wait_for_field_ready(
+                    page.locator("mat-checkbox input[type='checkbox']:checked").first, state="attached", timeout=2000
+                )
             except Exception as e:
-                print(f"[FORM] Coordinate click failed: {e}")
+                logger.info(f"[FORM] Coordinate click failed: {e}")
         
-        # Verify checkbox is now checked
-        page.wait_for_timeout(500)
-        try:
-            checkbox = page.locator("mat-checkbox").first
-            class_attr = checkbox.get_attribute("class") or ""
-            if "mat-checkbox-checked" in class_attr:
-                print("[FORM] SUCCESS: Checkbox verified as checked")
-            else:
-                print("[FORM] WARNING: Checkbox may not be checked!")
-                page.screenshot(path="checkbox_not_checked.png")
-        except:
-            pass
-        
-        # Extra wait before submit
-        page.wait_for_timeout(1500)
+        if checked:
+            logger.info("[FORM] SUCCESS: Checkbox verified as checked")
+        else:
+            logger.warning("[FORM] WARNING: Checkbox may not be checked!")
+            await page.screenshot(path="checkbox_not_checked.png")
         
         # Submit or stop
         if submit:
-            print("[FORM] Submitting application...")
+            logger.info("[FORM] Submitting application...")
+            # Snapshot the page first: only markers that appear after the click count,
+            # so text already on the form (e.g. the certify label) can't pass for a result
+            before = await page.evaluate('''() => ({
+                text: document.body.innerText,
+                snack: (document.querySelector('mat-snack-bar-container, snack-bar-container')?.innerText || '').trim(),
+                errorMessage: (document.querySelector('.error-message')?.innerText || '').trim(),
+            })''')
             # Use force=True in case any overlay is still present
-            page.locator("button:has-text('Submit')").first.click(force=True)
-            page.wait_for_timeout(3000)  # Wait for response
-            page.wait_for_load_state("networkidle")
+            await page.locator("button:has-text('Submit')").first.click(force=True)
             
-            # Check for errors - only flag if there's actual error text
-            error_selectors = [
-                "text=already exists",
-                "text=duplicate",
-                "text=Email is already",
-                "mat-snack-bar-container:has-text('error')",
-                "snack-bar-container:has-text('error')",
-                ".error-message",
-            ]
-            
-            error_found = False
-            for err_sel in error_selectors:
-                try:
-                    error_el = page.locator(err_sel).first
-                    if error_el.is_visible(timeout=1000):
-                        error_text = error_el.inner_text().strip()
-                        # Only flag as error if there's actual text content
-                        if error_text and len(error_text) > 5:
-                            print(f"[FORM] ERROR DETECTED: {error_text}")
-                            page.screenshot(path="submit_error.png")
-                            error_found = True
-                            break
-                except:
-                    continue
+            # One polling check for the first error or success signal; errors win ties
+            try:
+                outcome_handle = await page.wait_for_function('''(before) => {
+                    const text = document.body.innerText;
+                    const fresh = (pattern) => {
+                        const re = new RegExp(pattern, 'gi');
+                        const now = text.match(re) || [];
+                        return now.length > (before.text.match(re) || []).length ? now[now.length - 1] : null;
+                    };
+                    
+                    const error = fresh('already exists|duplicate|Email is already');
+                    if (error) return { status: 'error', detail: error };
+                    const snack = document.querySelector('mat-snack-bar-container, snack-bar-container');
+                    let snackText = snack ? snack.innerText.trim() : '';
+                    if (snackText === before.snack) snackText = '';
+                    if (/error/i.test(snackText)) return { status: 'error', detail: snackText };
+                    const errorMessage = document.querySelector('.error-message');
+                    const errorText = errorMessage ? errorMessage.innerText.trim() : '';
+                    // Only flag as error if there's new, actual text content
+                    if (errorText !== before.errorMessage && errorText.length > 5) return { status: 'error', detail: errorText };
+                    
+                    const success = fresh('successfully|submitted|Application has been|invitation has been sent');
+                    if (success) return { status: 'success', detail: success };
+                    if (/success/i.test(snackText)) return { status: 'success', detail: snackText };
+                    // getClientRects, not offsetParent - the latter is null for a position: fixed footer button
+                    const submitBtn = [...document.querySelectorAll('button')].find(b => /submit/i.test(b.innerText));
+                    if (!submitBtn || !submitBtn.getClientRects().length) return { status: 'success', detail: 'Submit button no longer visible' };
+                    return null;
+                }''', arg=before, timeout=TIMEOUT_MEDIUM, polling=250)
+                outcome = await outcome_handle.json_value()
+            except PlaywrightTimeoutError:
+                outcome = None
             
-            if error_found:
+            if outcome and outcome["status"] == "error":
+                logger.error(f"[FORM] ERROR DETECTED: {outcome['detail']}")
+                await page.screenshot(path="submit_error.png")
                 return False
             
-            # Check for success indicators
-            success_selectors = [
-                "text=successfully",
-                "text=submitted",
-                "text=Application has been",
-                "text=invitation has been sent",
-                "mat-snack-bar-container:has-text('success')",
-            ]
-            
             success_found = False
-            for suc_sel in success_selectors:
-                try:
-                    success_el = page.locator(suc_sel).first
-                    if success_el.is_visible(timeout=2000):
-                        success_text = success_el.inner_text().strip()
-                        if success_text:
-                            print(f"[FORM] SUCCESS: {success_text}")
-                            success_found = True
-                            break
-                except:
-                    continue
+            if outcome and outcome["status"] == "success":
+                logger.info(f"[FORM] SUCCESS: {outcome['detail']}")
+                success_found = True
             
             # Also check if we're back on the application list (redirect = success)
             if not success_found:
                 try:
-                    page_content = page.content()
-                    if "Initiate a New Badge" in page_content or "Application Management" in page_content:
-                        print("[FORM] SUCCESS: Redirected back to application list")
-                        success_found = True
-                except:
-                    pass
-            
-            # Check if Submit button is gone (means form was submitted)
-            if not success_found:
-                try:
-                    submit_btn = page.locator("button:has-text('Submit')").first
-                    if not submit_btn.is_visible(timeout=1000):
-                        print("[FORM] SUCCESS: Submit button no longer visible")
+                    if await page.evaluate('''(before) => {
+                        const re = /Initiate a New Badge|Application Management/g;
+                        return (document.body.innerText.match(re) || []).length > (before.match(re) || []).length;
+                    }''', before["text"]):
+                        logger.info("[FORM] SUCCESS: Redirected back to application list")
                         success_found = True
                 except:
                     pass
             
             if success_found:
-                print("[FORM] Application submitted successfully!")
+                logger.info("[FORM] Application submitted successfully!")
                 return True
             else:
-                print("[FORM] WARNING: Could not confirm submission - checking for errors...")
-                page.screenshot(path="submit_uncertain.png")
+                logger.warning("[FORM] WARNING: Could not confirm submission - checking for errors...")
+                await page.screenshot(path="submit_uncertain.png")
                 
                 # If no explicit error and no success, assume it worked
                 # (sometimes success message is quick and disappears)
-                print("[FORM] No error detected, assuming success")
+                logger.info("[FORM] No error detected, assuming success")
                 return True
         else:
-            print("[FORM] *** SUBMIT DISABLED - Form filled but not submitted ***")
+            logger.info("[FORM] *** SUBMIT DISABLED - Form filled but not submitted ***")
             return True
         
     except Exception as e:
-        print(f"[FORM] Error: {e}")
+        logger.error(f"[FORM] Error: {e}")
         return False
 
 
@@ -864,144 +1115,522 @@ def fill_application_form(page: Page, applicant: dict, submit: bool = False) ->
 # MAIN RUNNER
 # =============================================================================
 
-def run_application(applicant: dict, headless: bool = True, submit: bool = False) -> bool:
-    """Run the full application flow."""
-    print("=" * 60)
-    print(f"PIT ID Application Bot - {datetime.now()}")
-    print(f"Applicant: {applicant.get('first_name')} {applicant.get('last_name')}")
-    print(f"Submit: {submit}")
-    print("=" * 60)
+async def launch_browser(p: Playwright, headless: bool = True) -> Browser:
+    """Launch the Chromium instance shared by every applicant in a run."""
+    return await p.chromium.launch(headless=headless, args=LAUNCH_ARGS)
+
+
+async def _block_unneeded_requests(route: Route):
+    """Abort images, fonts, media and analytics; let everything else through."""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(m in request.url for m in BLOCKED_URL_MARKERS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def open_context(
+    browser: Browser, storage_state: Optional[Dict] = None, block_assets: bool = True
+) -> BrowserContext:
+    """Create a browser context with the bot's viewport and (unless disabled) request filtering."""
+    # Service workers would fetch outside context.route and hold extra memory per context
+    context = await browser.new_context(viewport=VIEWPORT, storage_state=storage_state, service_workers="block")
+    if block_assets:
+        await context.route("**/*", _block_unneeded_requests)
+    return context
+
+
+async def close_quietly(target: Page | BrowserContext):
+    """Close a page or context; one whose browser already crashed must not take the worker down too."""
+    try:
+        await target.close()
+    except Exception as e:
+        logger.warning(f"[WARN] Could not close {type(target).__name__}: {e}")
+
+
+async def open_dashboard(page: Page, dashboard_url: str) -> bool:
+    """Open the dashboard with an existing session, falling back to a full login."""
+    try:
+        await page.goto(dashboard_url, wait_until="domcontentloaded")
+        await page.locator("text=Application Management").first.wait_for(state="visible", timeout=TIMEOUT_MEDIUM)
+        return True
+    except Exception as e:
+        logger.info(f"[NAV] Session not reused ({e}) - logging in again")
+        return await login(page)
+
+
+async def open_application_management(page: Page, dashboard_url: str, app_mgmt_url: Optional[str] = None) -> bool:
+    """Open Application Management, going straight to it when its URL is already known."""
+    if app_mgmt_url:
+        try:
+            await page.goto(app_mgmt_url, wait_until="domcontentloaded")
+            await page.locator("text=Initiate").first.wait_for(state="visible", timeout=TIMEOUT_MEDIUM)
+            logger.info("[NAV] Opened Application Management directly")
+            return True
+        except Exception as e:
+            logger.info(f"[NAV] Direct link failed ({e}) - going via the dashboard")
+    
+    if not await open_dashboard(page, dashboard_url):
+        logger.error("[ERROR] Login failed")
+        return False
+    
+    if not await navigate_to_application_management(page):
+        logger.error("[ERROR] Could not navigate to Application Management")
+        return False
+    return True
+
+
+async def prepare_application(
+    context: BrowserContext, dashboard_url: str, app_mgmt_url: Optional[str] = None
+) -> Optional[Page]:
+    """Open a page at the duplicate check of a new application, ready for any applicant.
+    
+    Returns None (never raises) if the page can't be prepared, including when the
+    browser or renderer crashes while the page is being created.
+    """
+    page = None
+    try:
+        page = await context.new_page()
+        if await open_application_management(page, dashboard_url, app_mgmt_url):
+            if await initiate_new_application(page):
+                return page
+            logger.error("[ERROR] Could not initiate new application")
+    except Exception as e:
+        logger.error(f"[ERROR] Unexpected error: {e}")
+    if page is not None:
+        await close_quietly(page)
+    return None
+
+
+async def apply_one(page: Page, applicant: Applicant, submit: bool = False) -> bool:
+    """Fill in and (optionally) submit one applicant on a page from `prepare_application`."""
+    logger.info("=" * 60)
+    logger.info(f"PIT ID Application Bot - {datetime.now()}")
+    logger.info(f"Applicant: {applicant.first_name} {applicant.last_name}")
+    logger.info(f"Submit: {submit}")
+    logger.info("=" * 60)
+    
+    try:
+        if not await fill_duplicate_check(page, applicant.dob, applicant.ssn4):
+            logger.error("[ERROR] Duplicate check failed")
+            return False
+        
+        if not await fill_application_form(page, applicant, submit=submit):
+            logger.error("[ERROR] Form filling failed")
+            return False
+        
+        logger.info("[SUCCESS] Application process completed!")
+        return True
+        
+    except Exception as e:
+        logger.exception(f"[ERROR] Unexpected error: {e}")
+        return False
+    finally:
+        await close_quietly(page)
+
+
+async def run_applications(
+    fetch_applicants: Callable[[], Iterable[Applicant]],
+    headless: bool = True,
+    submit: bool = False,
+    workers: int = MAX_WORKERS,
+    on_success: Optional[Callable[[Applicant], None]] = None,
+    refresh_auth: bool = False,
+    block_assets: bool = True,
+) -> List[Tuple[Applicant, bool]]:
+    """Run the application flow for each fetched applicant, up to `workers` at a time.
     
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=headless)
-        context = browser.new_context(viewport={"width": 1280, "height": 800})
-        page = context.new_page()
+    `fetch_applicants` is iterated in a worker thread, so the first applicant is
+    fetched while the browser starts and the rest stream in as workers free up.
+    The saved session is reused when possible (logging in only if it is missing,
+    expired, or `refresh_auth` is set), and each applicant then gets its own
+    context on the shared browser. While one applicant is filled in, each worker
+    walks the next context up to the duplicate check, so that navigation is off
+    the critical path. Returns (applicant, success) pairs in fetch order.
+    """
+    from playwright.async_api import async_playwright
+    
+    session = None if refresh_auth else load_session()
+    load_selector_cache()
+    
+    def start_fetch() -> Tuple[Iterator[Applicant], Optional[Applicant]]:
+        pending = iter(fetch_applicants())
+        return pending, next(pending, None)
+    
+    applicants: List[Applicant] = []
+    results: List[bool] = []
+    
+    async with async_playwright() as p:
+        # Hide the browser cold start behind the (blocking) DB round trip
+        browser, (pending, first) = await asyncio.gather(
+            launch_browser(p, headless),
+            asyncio.to_thread(start_fetch),
+        )
         
         try:
-            if not login(page):
-                print("[ERROR] Login failed")
-                return False
+            if first is None:
+                return []
             
-            if not navigate_to_application_management(page):
-                print("[ERROR] Could not navigate to Application Management")
-                return False
+            if session:
+                logger.info(f"[LOGIN] Reusing saved session from {AUTH_STATE_PATH}")
+                context = await open_context(browser, storage_state=session["storage_state"], block_assets=block_assets)
+            else:
+                context = await open_context(browser, block_assets=block_assets)
             
-            if not initiate_new_application(page):
-                print("[ERROR] Could not initiate new application")
-                return False
+            page = await context.new_page()
+            app_mgmt_url = None
+            try:
+                if session:
+                    logged_in = await open_dashboard(page, session["dashboard_url"])
+                else:
+                    logged_in = await login(page)
+                dashboard_url = page.url
+                # Learn the Application Management URL once so workers can skip the dashboard
+                if logged_in and await navigate_to_application_management(page):
+                    app_mgmt_url = page.url
+            except Exception as e:
+                logger.error(f"[ERROR] Unexpected error: {e}")
+                logged_in = False
+            finally:
+                await page.close()
             
-            if not fill_duplicate_check(page, applicant["dob"], applicant["ssn4"]):
-                print("[ERROR] Duplicate check failed")
-                return False
+            if not logged_in:
+                logger.error("[ERROR] Login failed")
+                applicants = [first, *await asyncio.to_thread(list, pending)]
+                return [(applicant, False) for applicant in applicants]
             
-            if not fill_application_form(page, applicant, submit=submit):
-                print("[ERROR] Form filling failed")
-                return False
+            state = await context.storage_state()
+            save_session(state, dashboard_url)
+            await context.close()
             
-            print("[SUCCESS] Application process completed!")
-            return True
+            # Bounded, so the fetch only runs a little ahead of the workers
+            queue = asyncio.Queue(maxsize=workers)
+            relaunch_lock = asyncio.Lock()
+            fetch_error = None
+            queued = 0  # Applicants in the queue (not counting the end markers)
+            exhausted = False  # The producer has already fetched the last applicant
+            prefetching = 0  # Pages workers have prepared ahead for applicants not yet taken
             
-        except Exception as e:
-            print(f"[ERROR] Unexpected error: {e}")
-            return False
+            async def produce():
+                nonlocal fetch_error, queued, exhausted
+                applicant = first
+                while applicant is not None:
+                    # Look one ahead so workers know whether anyone follows this applicant
+                    try:
+                        following = await asyncio.to_thread(next, pending, None)
+                    except Exception as e:
+                        # Let the workers finish what was already fetched, then re-raise
+                        logger.error(f"[ERROR] Fetching applicants failed: {e}")
+                        fetch_error, following = e, None
+                    exhausted = following is None
+                    applicants.append(applicant)
+                    results.append(False)
+                    queued += 1
+                    await queue.put((len(applicants) - 1, applicant))
+                    applicant = following
+                # Only reached while workers are still draining the queue; if they all
+                # fail, the producer is cancelled instead of blocking on a full queue
+                for _ in range(workers):
+                    await queue.put(None)
+            
+            def new_log_buffer() -> Optional[MemoryHandler]:
+                # Holds one block of log lines so concurrent workers don't interleave
+                return MemoryHandler(1000, flushLevel=logging.CRITICAL + 1, target=_CONSOLE) if concurrent else None
+            
+            async def prepare() -> Tuple[Optional[BrowserContext], Optional[Page], Optional[MemoryHandler]]:
+                # Always run as its own task, so the buffer only applies to this preparation
+                buffer = new_log_buffer()
+                _LOG_BUFFER.set(buffer)
+                try:
+                    # A fresh context per applicant is cheap and keeps form state isolated
+                    ctx = await open_context(browser, storage_state=state, block_assets=block_assets)
+                except Exception as e:
+                    logger.error(f"[ERROR] Could not open a browser context: {e}")
+                    return None, None, buffer
+                page = await prepare_application(ctx, dashboard_url, app_mgmt_url)
+                if page is None:
+                    # Nothing will use this context, so don't leave it open on the browser
+                    await close_quietly(ctx)
+                    return None, None, buffer
+                return ctx, page, buffer
+            
+            async def take_prepared(task: asyncio.Task) -> Tuple[Optional[BrowserContext], Optional[Page]]:
+                ctx, page, buffer = await task
+                if buffer:
+                    buffer.close()
+                return ctx, page
+            
+            async def ensure_browser():
+                # Keep one browser for the whole run; only replace it if it died
+                nonlocal browser
+                async with relaunch_lock:
+                    if not browser.is_connected():
+                        logger.warning("[WARN] Browser disconnected - relaunching")
+                        browser = await launch_browser(p, headless)
+            
+            async def worker():
+                nonlocal state, queued, prefetching
+                prepared = None  # Next applicant's page, walked to the duplicate check in the background
+                try:
+                    while (item := await queue.get()) is not None:
+                        queued -= 1
+                        index, applicant = item
+                        
+                        await ensure_browser()
+                        if prepared is not None:
+                            prefetching -= 1
+                        ctx, page = await take_prepared(prepared or asyncio.create_task(prepare()))
+                        prepared = None
+                        if page is None or not ctx.browser.is_connected():
+                            # The page failed, or was prepared on a browser that has since died
+                            # (prepare() closes its own context when it returns no page)
+                            if ctx:
+                                await close_quietly(ctx)
+                            await ensure_browser()
+                            ctx, page = await take_prepared(asyncio.create_task(prepare()))
+                        
+                        # Get the next applicant's page ready while this one is filled and submitted,
+                        # but only while some applicant is left that no other prefetch is waiting for
+                        if queued + (0 if exhausted else 1) > prefetching:
+                            prefetching += 1
+                            prepared = asyncio.create_task(prepare())
+                        
+                        buffer = new_log_buffer()
+                        token = _LOG_BUFFER.set(buffer)
+                        try:
+                            if page is None:
+                                logger.error(f"[ERROR] Could not start an application for {applicant.first_name} {applicant.last_name}")
+                            else:
+                                results[index] = await apply_one(page, applicant, submit=submit)
+                                if results[index]:
+                                    # Carry any cookies the portal refreshed into later contexts
+                                    try:
+                                        state = await ctx.storage_state()
+                                    except Exception:
+                                        pass
+                                elif not browser.is_connected():
+                                    # Only a dead browser is replaced; other failures just lose this page
+                                    logger.error("[ERROR] Browser crashed - relaunching it for the next applicant")
+                        finally:
+                            if ctx:
+                                await close_quietly(ctx)
+                            _LOG_BUFFER.reset(token)
+                            if buffer:
+                                buffer.close()
+                        
+                        if results[index] and on_success:
+                            on_success(applicant)
+                finally:
+                    # Nobody is left to use the page prepared last
+                    if prepared is not None:
+                        prefetching -= 1
+                        ctx, _ = await take_prepared(prepared)
+                        if ctx:
+                            await close_quietly(ctx)
+            
+            concurrent = workers > 1
+            producer = asyncio.create_task(produce())
+            try:
+                # Let the other workers finish their applicants even if one of them fails
+                outcomes = await asyncio.gather(*(worker() for _ in range(workers)), return_exceptions=True)
+            finally:
+                producer.cancel()
+                try:
+                    await producer
+                except asyncio.CancelledError:
+                    pass
+            for outcome in outcomes:
+                if isinstance(outcome, BaseException):
+                    raise outcome
+            if fetch_error:
+                raise fetch_error
+            # Leave the freshest session on disk so the next run skips login too
+            save_session(state, dashboard_url)
         finally:
-            browser.close()
+            await browser.close()
+            save_selector_cache()
+    
+    return list(zip(applicants, results))
+
+
+def run_application(
+    applicant: Applicant,
+    headless: bool = True,
+    submit: bool = False,
+    refresh_auth: bool = False,
+    block_assets: bool = True,
+) -> bool:
+    """Run the full application flow for a single applicant."""
+    errors = validate_applicant(applicant)
+    if errors:
+        logger.error(f"[VALIDATION] {applicant.first_name} {applicant.last_name}: {', '.join(errors)}")
+        return False
+    
+    [(_, success)] = asyncio.run(run_applications(
+        lambda: [applicant], headless=headless, submit=submit, workers=1,
+        refresh_auth=refresh_auth, block_assets=block_assets,
+    ))
+    return success
 
 
-def run_apply(application_id: str = None, all_pending: bool = False, submit: bool = False, headless: bool = True):
+def run_apply(
+    application_id: str = None,
+    all_pending: bool = False,
+    submit: bool = False,
+    headless: bool = True,
+    refresh_auth: bool = False,
+    workers: int = MAX_WORKERS,
+    block_assets: bool = True,
+):
     """Run application submission."""
     if application_id:
         record = get_application_by_id(application_id)
         if not record:
-            print(f"[ERROR] Application {application_id} not found")
+            logger.error(f"[ERROR] Application {application_id} not found")
             return
         
         applicant = format_applicant_for_bot(record)
-        print(f"[INFO] Processing: {applicant['first_name']} {applicant['last_name']}")
-        success = run_application(applicant, headless=headless, submit=submit)
+        logger.info(f"[INFO] Processing: {applicant.first_name} {applicant.last_name}")
+        success = run_application(
+            applicant, headless=headless, submit=submit, refresh_auth=refresh_auth, block_assets=block_assets
+        )
         
         if success and submit:
             mark_badge_request_sent(application_id)
-            print(f"[INFO] Marked badge request as sent")
+            logger.info(f"[INFO] Marked badge request as sent")
         elif not success:
-            print(f"[ERROR] Application failed - NOT marking as sent")
+            logger.error(f"[ERROR] Application failed - NOT marking as sent")
     
     elif all_pending:
-        records = get_pending_airport_applications()
-        print(f"[INFO] Found {len(records)} pending airport badge applications")
+        def fetch_applicants() -> Iterator[Applicant]:
+            found = 0
+            for record in iter_pending_airport_applications():
+                found += 1
+                applicant = format_applicant_for_bot(record)
+                # Bad data would only fail inside the form, so skip it before the browser sees it
+                errors = validate_applicant(applicant)
+                if errors:
+                    logger.error(f"[VALIDATION] {applicant.first_name} {applicant.last_name}: {', '.join(errors)}")
+                    rejected.append(applicant)
+                    continue
+                logger.info("=" * 40)
+                logger.info(f"Queued: {applicant.first_name} {applicant.last_name}")
+                logger.info(f"DOB: {applicant.dob}, SSN4: {applicant.ssn4}")
+                logger.info(f"Email: {applicant.email}, Phone: {applicant.phone}")
+                yield applicant
+            logger.info(f"[INFO] Found {found} pending airport badge applications")
+        
+        successful_ids = []
+        rejected = []
+        
+        def record_success(applicant: Applicant):
+            if submit:
+                successful_ids.append(applicant.submission_id)
+        
+        # Mark whatever was submitted even if the run is interrupted part-way,
+        # so those applicants are not re-submitted on the next run.
+        try:
+            results = asyncio.run(run_applications(
+                fetch_applicants, headless=headless, submit=submit, workers=workers,
+                on_success=record_success, refresh_auth=refresh_auth, block_assets=block_assets,
+            ))
+        finally:
+            if successful_ids:
+                marked = mark_badge_requests_sent(successful_ids)
+                logger.info(f"[INFO] Marked {marked}/{len(successful_ids)} badge requests as sent")
         
-        if not records:
-            print("[INFO] No pending applications to process")
+        if not results and not rejected:
+            logger.info("[INFO] No pending applications to process")
             return
         
-        success_count = 0
-        fail_count = 0
-        
-        for record in records:
-            applicant = format_applicant_for_bot(record)
-            print("=" * 40)
-            print(f"Processing: {applicant['first_name']} {applicant['last_name']}")
-            print(f"DOB: {applicant['dob']}, SSN4: {applicant['ssn4']}")
-            print(f"Email: {applicant['email']}, Phone: {applicant['phone']}")
-            
-            success = run_application(applicant, headless=headless, submit=submit)
-            
-            if success and submit:
-                mark_badge_request_sent(record["id"])
-                print(f"[INFO] Marked badge request as sent for {record['id']}")
-                success_count += 1
-            elif not success:
-                print(f"[ERROR] Application failed for {applicant['first_name']} {applicant['last_name']} - NOT marking as sent")
+        fail_count = len(rejected)
+        for applicant in rejected:
+            logger.error(f"[ERROR] Invalid data for {applicant.first_name} {applicant.last_name} - NOT submitted")
+        for applicant, success in results:
+            if not success:
+                logger.error(f"[ERROR] Application failed for {applicant.first_name} {applicant.last_name} - NOT marking as sent")
                 fail_count += 1
         
-        print("=" * 40)
-        print(f"[SUMMARY] Completed: {success_count} success, {fail_count} failed")
+        success_count = len(successful_ids)
+        logger.info("=" * 40)
+        logger.info(f"[SUMMARY] Completed: {success_count} success, {fail_count} failed")
 
 
-def run_test(headless: bool = True):
+def run_test(headless: bool = True, refresh_auth: bool = False, block_assets: bool = True):
     """Run with test data."""
-    test_applicant = {
-        "first_name": "Test",
-        "last_name": "User",
-        "middle_name": "",
-        "dob": "01/15/1990",
-        "ssn4": "1234",
-        "email": "jchung@atlaswe.com",
-        "phone": "4125551234",
-    }
+    test_applicant = Applicant(
+        first_name="Test",
+        last_name="User",
+        dob="01/15/1990",
+        ssn4="1234",
+        email="jchung@atlaswe.com",
+        phone="4125551234",
+    )
+    
+    logger.info(f"[TEST] Running with test data (submit disabled)")
+    run_application(
+        test_applicant, headless=headless, submit=False, refresh_auth=refresh_auth, block_assets=block_assets
+    )
+
+
+def _cmd_apply(argv: List[str]):
+    parser = argparse.ArgumentParser(prog="main.py apply", description="Submit badge applications")
+    parser.add_argument("--id", type=str, help="Specific application ID")
+    parser.add_argument("--all", action="store_true", help="Process all pending")
+    parser.add_argument("--submit", action="store_true", help="Actually submit")
+    parser.add_argument("--visible", action="store_true", help="Show browser")
+    parser.add_argument("--refresh-auth", action="store_true", help="Log in again instead of reusing the saved session")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help=f"Applicants processed at once with --all (default {MAX_WORKERS})")
+    parser.add_argument("--full-assets", action="store_true", help="Load images, fonts and analytics (for debugging)")
+    args = parser.parse_args(argv)
     
-    print(f"[TEST] Running with test data (submit disabled)")
-    run_application(test_applicant, headless=headless, submit=False)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    SETTINGS.validate()
+    run_apply(
+        application_id=args.id,
+        all_pending=args.all,
+        submit=args.submit,
+        headless=not args.visible,
+        refresh_auth=args.refresh_auth,
+        workers=args.workers,
+        block_assets=not args.full_assets,
+    )
+
+
+def _cmd_test(argv: List[str]):
+    parser = argparse.ArgumentParser(prog="main.py test", description="Test with dummy data")
+    parser.add_argument("--visible", action="store_true", help="Show browser")
+    parser.add_argument("--refresh-auth", action="store_true", help="Log in again instead of reusing the saved session")
+    parser.add_argument("--full-assets", action="store_true", help="Load images, fonts and analytics (for debugging)")
+    args = parser.parse_args(argv)
+    
+    SETTINGS.validate(supabase=False)
+    run_test(headless=not args.visible, refresh_auth=args.refresh_auth, block_assets=not args.full_assets)
+
+
+COMMANDS = {
+    "apply": (_cmd_apply, "Submit badge applications"),
+    "test": (_cmd_test, "Test with dummy data"),
+}
 
 
 def main():
+    argv = sys.argv[1:]
+    
+    # Only the parser for the command actually being run gets built
+    if argv and argv[0] in COMMANDS:
+        command, _ = COMMANDS[argv[0]]
+        command(argv[1:])
+        return
+    
     parser = argparse.ArgumentParser(description="PIT ID Badge Application Bot")
-    subparsers = parser.add_subparsers(dest="command", help="Commands")
-    
-    # Apply command
-    apply_parser = subparsers.add_parser("apply", help="Submit badge applications")
-    apply_parser.add_argument("--id", type=str, help="Specific application ID")
-    apply_parser.add_argument("--all", action="store_true", help="Process all pending")
-    apply_parser.add_argument("--submit", action="store_true", help="Actually submit")
-    apply_parser.add_argument("--visible", action="store_true", help="Show browser")
-    
-    # Test command
-    test_parser = subparsers.add_parser("test", help="Test with dummy data")
-    test_parser.add_argument("--visible", action="store_true", help="Show browser")
-    
-    args = parser.parse_args()
-    
-    if args.command == "apply":
-        run_apply(
-            application_id=args.id,
-            all_pending=args.all,
-            submit=args.submit,
-            headless=not args.visible
-        )
-    elif args.command == "test":
-        run_test(headless=not args.visible)
-    else:
-        parser.print_help()
+    parser.add_argument(
+        "command", nargs="?", choices=list(COMMANDS),
+        help="; ".join(f"{name}: {description}" for name, (_, description) in COMMANDS.items()),
+    )
+    parser.parse_args(argv)
+    parser.print_help()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,19 @@
+-- New hires at a store who still need an airport badge application:
+-- SSN last 4 on file and no setup task already marked as sent.
+-- Called by the badge bot as rpc("pending_airport_applications", {"p_store_number": ...}).
+create or replace function public.pending_airport_applications(p_store_number text)
+returns setof public.new_hire_submissions
+language sql
+stable
+as $$
+    select s.*
+    from public.new_hire_submissions s
+    where s.store_number = p_store_number
+      and s.ssn_last_4 is not null
+      and not exists (
+          select 1
+          from public.new_hire_setup_tasks t
+          where t.new_hire_id = s.id
+            and t.airport_badge_request_sent is true
+      );
+$$;
@@ -0,0 +1,15 @@
+-- Indexes for pending_airport_applications() and the badge-sent updates.
+-- Postgres does not index foreign keys on its own.
+--
+-- Not CONCURRENTLY: migrations run inside a transaction, and both tables are
+-- small enough that the brief write lock is acceptable.
+
+-- Pending lookup: store_number filter, only rows with SSN last 4 on file
+create index if not exists idx_nhs_store_ssn
+    on public.new_hire_submissions (store_number)
+    where ssn_last_4 is not null;
+
+-- NOT EXISTS probe in the pending lookup, and UPDATE ... WHERE new_hire_id
+-- in mark_badge_request_sent / mark_badge_requests_sent
+create index if not exists idx_nhst_new_hire_id
+    on public.new_hire_setup_tasks (new_hire_id);